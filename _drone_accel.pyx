@@ -0,0 +1,45 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional C kernel for the hot parse/checksum path.
+
+The pure-Python harness is fine for normal scanning, but at wire-rate
+fuzzing (thousands of packets/s) the per-frame XOR fold and verification
+become the bottleneck. This module moves that inner loop to C; drone_tool
+imports it if present and silently falls back to Python otherwise.
+
+Build (needs Cython + a C compiler, both optional):
+
+    pip install cython
+    python setup.py build_ext --inplace
+"""
+
+
+cpdef int xor_checksum(const unsigned char[::1] data):
+    """XOR-fold a buffer into one byte. Drop-in for the Python fold."""
+    cdef Py_ssize_t i, n = data.shape[0]
+    cdef unsigned char chk = 0
+    with nogil:
+        for i in range(n):
+            chk ^= data[i]
+    return chk
+
+
+cpdef tuple frame_scan(const unsigned char[::1] data):
+    """
+    Single pass over a candidate frame (len >= 2 required).
+
+    Returns (expected_total, calc_chk) where expected_total is derived from
+    the length byte (Header + LenByte + LenVal + Checksum) and calc_chk is
+    the XOR of the body bytes, i.e. everything before the checksum slot,
+    clamped to the buffer. Branching (bad header / truncated / bad
+    checksum) stays on the Python side so the two code paths can't drift.
+    """
+    cdef Py_ssize_t n = data.shape[0]
+    cdef Py_ssize_t total = 1 + 1 + data[1] + 1
+    cdef Py_ssize_t limit = total - 1 if total - 1 < n else n
+    cdef unsigned char chk = 0
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(limit):
+            chk ^= data[i]
+    return total, chk
@@ -0,0 +1,365 @@
+"""
+Live telemetry dashboard.
+
+Optional extra on top of the scanner: polls GET_TELEMETRY at 10 Hz and
+plots altitude/battery/voltage in the browser via Dash. Unlike the core
+tool this needs third-party packages:
+
+    pip install dash plotly numpy
+
+The core harness stays standard-library only; if you can't install these
+on a field laptop, you lose nothing except the pretty graphs.
+"""
+import asyncio
+import logging
+import os
+import time
+
+try:
+    import numpy as np
+    import dash
+    from dash import dcc, html
+    from dash.dependencies import Input, Output, State
+    import plotly.graph_objects as go
+    from asgiref.wsgi import WsgiToAsgi
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config as HypercornConfig
+except ImportError as e:
+    raise SystemExit(
+        f"dashboard.py needs the optional dashboard extras (missing: {e.name}).\n"
+        "Install them with: pip install dash plotly numpy hypercorn asgiref"
+    )
+
+from drone_tool import DroneProtocol, HardwareClient, OpCode
+
+logger = logging.getLogger(__name__)
+
+POLL_HZ = 10       # telemetry poll rate
+
+# Retained history (samples). Default: one hour at the poll rate. The
+# browser never sees more than MAX_SHOWN points of it at once.
+HISTORY_SAMPLES = int(os.getenv("TELEMETRY_HISTORY", str(3600 * POLL_HZ)))
+MAX_SHOWN = 500    # LTTB target for the page-load seed / live window cap
+
+# ==============================================================================
+# 1. TELEMETRY STORE
+# ==============================================================================
+
+# One row per sample; a single contiguous buffer keeps the write a single
+# C-level row assignment and the snapshot at most two memcpy-style slices.
+_RING_DT = np.dtype([
+    ("t", "f8"),
+    ("bat", "u1"),
+    ("volt", "<u2"),
+    ("alt", "f4"),
+])
+
+class TelemetryStore:
+    """
+    Fixed-size telemetry history shared between the poller task and the
+    Dash callbacks.
+
+    A single NumPy structured-array ring plus a monotonically increasing
+    head counter: sample number i lives at i % max_len, and _head is only
+    bumped AFTER the row write, so a reader that snapshots _head first
+    never sees a half-written row.
+
+    Note the reads and writes really are on different threads: the poller
+    writes on the event loop, but WsgiToAsgi runs the Dash callbacks on
+    asgiref's sync worker thread. It stays lock-free because it is strictly
+    single-producer/single-consumer — one poller, one serialized WSGI
+    reader — plus the write-then-publish ordering above under the GIL.
+    That guarantee does NOT extend further: never read-modify-write store
+    state from a callback, that would race the poller.
+    """
+    def __init__(self, max_len: int = HISTORY_SAMPLES):
+        self.max_len = max_len
+        self._ring = np.zeros(max_len, dtype=_RING_DT)
+        self._head = 0  # samples ever written (monotonic, never wraps)
+
+    def add_reading(self, t: float, battery: int, voltage: int, altitude: float) -> None:
+        h = self._head
+        self._ring[h % self.max_len] = (t, battery, voltage, altitude)
+        self._head = h + 1  # publish the row
+
+    @staticmethod
+    def _columns(rows: np.ndarray) -> dict:
+        return {
+            "Time": rows["t"],
+            "Battery": rows["bat"],
+            "Voltage": rows["volt"],
+            "Altitude": rows["alt"],
+        }
+
+    def get_new(self, since: int):
+        """
+        Rows written after sample number `since`, in chronological order.
+
+        Returns (head, cols_or_None). The caller remembers the returned
+        head and passes it back next tick, so steady-state pulls exactly
+        one row instead of re-copying the whole ring. If more than max_len
+        rows arrived since last time, only the surviving ones come back.
+        """
+        h = self._head
+        n = min(h - since, self.max_len)
+        if n <= 0:
+            return h, None
+        idx = np.arange(h - n, h) % self.max_len
+        return h, self._columns(self._ring[idx])
+
+    def get_snapshot(self) -> dict:
+        """
+        Snapshot of the buffer in chronological order, as plain arrays.
+
+        This used to hand back a DataFrame, but every consumer (Plotly
+        included) immediately pulled the columns out as arrays again, so
+        the DataFrame construction - block manager, index, dtype sniffing -
+        was pure overhead. Wraparound costs at most one concatenate of two
+        ring slices; until the ring wraps this is a plain view.
+        """
+        h = self._head
+        n = min(h, self.max_len)
+        lo = (h - n) % self.max_len
+        hi = h % self.max_len
+        if n == 0:
+            rows = self._ring[:0]
+        elif lo < hi:
+            rows = self._ring[lo:hi]
+        else:
+            rows = np.concatenate((self._ring[lo:], self._ring[:hi]))
+        return self._columns(rows)
+
+def _lttb(x: np.ndarray, y: np.ndarray, n_out: int):
+    """
+    Largest-Triangle-Three-Buckets downsample to n_out points.
+
+    Used to seed the figures on page load: an hour of retained history is
+    36k points, which would choke the browser, while LTTB keeps the
+    visually significant ones. Implemented in ~20 lines of NumPy rather
+    than pulling in plotly-resampler, whose callback machinery would fight
+    the extendData pipeline below.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    yf = y.astype(np.float64)
+    # Bucket edges for the middle points; first/last kept verbatim.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    sel = np.empty(n_out, dtype=np.intp)
+    sel[0] = 0
+    sel[-1] = n - 1
+
+    a = 0  # last selected point
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if hi <= lo:
+            hi = lo + 1
+        # Third triangle vertex: average of the NEXT bucket.
+        if i + 2 <= n_out - 2:
+            avg_x = x[edges[i + 1]:edges[i + 2]].mean()
+            avg_y = yf[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], yf[-1]
+        ax, ay = x[a], yf[a]
+        areas = np.abs((ax - avg_x) * (yf[lo:hi] - ay)
+                       - (ax - x[lo:hi]) * (avg_y - ay))
+        a = lo + int(areas.argmax())
+        sel[i + 1] = a
+
+    return x[sel], y[sel]
+
+# ==============================================================================
+# 2. BACKGROUND POLLER
+# ==============================================================================
+
+async def _poll_loop(store: TelemetryStore, ip: str, port: int) -> None:
+    client = HardwareClient(ip=ip, port=port, timeout=0.5)
+    await client.connect()
+    # Built once; build_packet is memoized anyway but there's no reason to
+    # even hit the cache 10 times a second.
+    pkt = DroneProtocol.build_packet(OpCode.GET_TELEMETRY)
+
+    try:
+        while True:
+            rx = await client.send_command(pkt, retries=0,
+                                           expected_opcode=OpCode.GET_TELEMETRY)
+            if rx:
+                frame = DroneProtocol.parse_frame(rx)
+                if frame.is_valid:
+                    telem = DroneProtocol.decode_telemetry(frame.payload)
+                    if "error" not in telem:
+                        store.add_reading(time.time(), telem["battery"],
+                                          telem["voltage"], telem["altitude"])
+            await asyncio.sleep(1 / POLL_HZ)
+    finally:
+        client.close()
+
+# ==============================================================================
+# 3. DASH APP
+# ==============================================================================
+
+store = TelemetryStore()
+
+def _init_alt_figure(x, y) -> go.Figure:
+    fig = go.Figure(go.Scatter(x=x, y=y, mode="lines"))
+    fig.update_layout(title="Altitude (m)", margin=dict(t=40, b=20))
+    return fig
+
+def _init_pwr_figure(xb, bat, xv, volt) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=xb, y=bat, mode="lines", name="Battery %"))
+    fig.add_trace(go.Scatter(x=xv, y=volt, mode="lines", name="Voltage (mV)",
+                             yaxis="y2"))
+    fig.update_layout(
+        title="Power",
+        margin=dict(t=40, b=20),
+        yaxis=dict(title="Battery %", range=[0, 100]),
+        yaxis2=dict(title="Voltage (mV)", overlaying="y", side="right"),
+    )
+    return fig
+
+app = dash.Dash(__name__)
+app.title = "Drone Telemetry"
+
+def _serve_layout():
+    # Built per page load: seed the figures with an LTTB-downsampled view
+    # of the retained history (otherwise a browser refresh would start the
+    # graphs empty), then let extendData take over from the current head.
+    head, cols = store.get_new(0)
+    if cols is None:
+        e = np.empty(0)
+        xa = ya = xb = bat = xv = volt = e
+    else:
+        xa, ya = _lttb(cols["Time"], cols["Altitude"], MAX_SHOWN)
+        xb, bat = _lttb(cols["Time"], cols["Battery"], MAX_SHOWN)
+        xv, volt = _lttb(cols["Time"], cols["Voltage"], MAX_SHOWN)
+
+    return html.Div([
+        html.H3("Drone Telemetry"),
+        html.Div(id="status-text", children="Waiting for telemetry..."),
+        # Figures are seeded ONCE here. Ticks only append points via
+        # extendData, so the browser never re-parses a full trace.
+        dcc.Graph(id="graph-altitude", figure=_init_alt_figure(xa, ya)),
+        dcc.Graph(id="graph-power", figure=_init_pwr_figure(xb, bat, xv, volt)),
+        # Two staggered 1 s intervals, one per graph. Updating both graphs
+        # from a single tick made the browser main thread repaint both in
+        # one go - a visible once-per-second stutter. Offsetting them by
+        # half a period keeps the refresh rate but halves the per-frame
+        # work.
+        dcc.Interval(id="int-alt", interval=1000, n_intervals=0),
+        dcc.Interval(id="int-pwr", interval=1000, n_intervals=0, disabled=True),
+        # One-shot 500 ms timer that arms int-pwr, creating the phase offset.
+        dcc.Interval(id="int-arm", interval=500, n_intervals=0, max_intervals=1),
+        # Highest sample number already shipped (the seed covers up to head).
+        dcc.Store(id="sent-alt", data=head),
+        dcc.Store(id="sent-pwr", data=head),
+        # Raw samples on their way to the browser; consumed client-side.
+        dcc.Store(id="feed-alt"),
+        dcc.Store(id="feed-pwr"),
+    ])
+
+app.layout = _serve_layout
+
+@app.callback(
+    Output("feed-alt", "data"),
+    Output("status-text", "children"),
+    Output("sent-alt", "data"),
+    Input("int-alt", "n_intervals"),
+    State("sent-alt", "data"),
+)
+def feed_altitude(n_intervals, sent):
+    # Server side only forwards the rows the browser hasn't seen; turning
+    # them into extendData patches happens in the browser (below), so
+    # Python does no per-graph work at all.
+    total, cols = store.get_new(sent or 0)
+    if cols is None:
+        return dash.no_update, dash.no_update, total
+
+    data = {"t": cols["Time"].tolist(), "alt": cols["Altitude"].tolist()}
+    status = (f"Battery: {cols['Battery'][-1]}%  |  "
+              f"Voltage: {cols['Voltage'][-1]} mV  |  "
+              f"Altitude: {cols['Altitude'][-1]:.2f} m")
+    return data, status, total
+
+@app.callback(
+    Output("feed-pwr", "data"),
+    Output("sent-pwr", "data"),
+    Input("int-pwr", "n_intervals"),
+    State("sent-pwr", "data"),
+)
+def feed_power(n_intervals, sent):
+    total, cols = store.get_new(sent or 0)
+    if cols is None:
+        return dash.no_update, total
+
+    data = {"t": cols["Time"].tolist(), "bat": cols["Battery"].tolist(),
+            "volt": cols["Voltage"].tolist()}
+    return data, total
+
+# Arm the power interval once the 500 ms one-shot fires, so its ticks land
+# halfway between the altitude ticks.
+app.clientside_callback(
+    "function(n) { return !(n > 0); }",
+    Output("int-pwr", "disabled"),
+    Input("int-arm", "n_intervals"),
+)
+
+# Pure JS: append the new samples (Plotly.extendTraces under the hood) with
+# a maxpoints cap so the window slides client-side. No Python, no JSON
+# round trip of the existing traces.
+app.clientside_callback(
+    """
+    function(data) {
+        if (!data) { return window.dash_clientside.no_update; }
+        return [{x: [data.t], y: [data.alt]}, [0], %d];
+    }
+    """ % MAX_SHOWN,
+    Output("graph-altitude", "extendData"),
+    Input("feed-alt", "data"),
+)
+
+app.clientside_callback(
+    """
+    function(data) {
+        if (!data) { return window.dash_clientside.no_update; }
+        return [{x: [data.t, data.t], y: [data.bat, data.volt]}, [0, 1], %d];
+    }
+    """ % MAX_SHOWN,
+    Output("graph-power", "extendData"),
+    Input("feed-pwr", "data"),
+)
+
+# ==============================================================================
+# MAIN ENTRY
+# ==============================================================================
+
+async def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+
+    target_ip = os.getenv("TARGET_IP", "127.0.0.1")
+    target_port = int(os.getenv("TARGET_PORT", "8889"))
+    logger.info(f"Polling telemetry from {target_ip}:{target_port}")
+
+    # Poller and web server share one event loop and process, no cross-loop
+    # queue hop. (Dash callbacks themselves run on asgiref's sync worker
+    # thread, not the loop - see TelemetryStore for why that's still safe
+    # without a lock.)
+    poller = asyncio.create_task(_poll_loop(store, target_ip, target_port))
+
+    config = HypercornConfig()
+    config.bind = [os.getenv("DASH_BIND", "127.0.0.1:8050")]
+    try:
+        await hypercorn_serve(WsgiToAsgi(app.server), config)
+    finally:
+        poller.cancel()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,18 +1,34 @@
-
-```python
 import asyncio
 import logging
 import struct
 import csv
 import time
 import os
+import operator
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import Optional, Tuple, Dict, Any, cast
+from functools import lru_cache, reduce
+from typing import Optional, Tuple, Dict, Any, Callable, NamedTuple, Union, cast
 
 # NOTE: Logging config is moved to __main__ to prevent side effects on import.
 logger = logging.getLogger(__name__)
 
+# Pre-compiled struct formats. Module-level struct.pack/unpack re-parses the
+# format string on every call; these skip that on the per-packet paths.
+_HDR = struct.Struct("<BBB")     # Header, Len, Opcode
+_TELEM = struct.Struct("<BHfB")  # Battery, Voltage, Altitude, Errors
+
+# bytes.hex() is C-fast but lowercase; one translate pass beats a second
+# full .upper() scan when uppercasing payload dumps.
+_UP = str.maketrans("abcdef", "ABCDEF")
+
+# Optional compiled kernel for wire-rate fuzzing. Pure-Python fallbacks are
+# used when it isn't built (see _drone_accel.pyx / setup.py).
+try:
+    from _drone_accel import frame_scan as _frame_scan, xor_checksum as _xor_checksum
+except ImportError:
+    _frame_scan = None
+    _xor_checksum = None
+
 # ==============================================================================
 # 1. HARDENED HARDWARE CLIENT
 # ==============================================================================
@@ -29,14 +45,21 @@ class HardwareClient:
         self.timeout = timeout
         self.transport: Optional[asyncio.DatagramTransport] = None
         self.protocol: Optional['HardwareClient.TransportProtocol'] = None
-        self._rx_queue: asyncio.Queue[bytes] = asyncio.Queue()
+        # Awaiting table: opcode -> future of the caller waiting for that
+        # reply. The opcode byte doubles as a transaction id, which is what
+        # lets several commands be in flight at once.
+        self._pending: Dict[int, 'asyncio.Future[bytes]'] = {}
+        # Bound transport.sendto, cached at connect() time. Skips two
+        # attribute lookups per send and doubles as the "connected" flag.
+        self._sendto: Optional[Callable[[bytes], None]] = None
 
     class TransportProtocol(asyncio.DatagramProtocol):
         """
-        Protocol layer that filters traffic and manages the transport reference.
+        Protocol layer that filters traffic and routes replies to waiters.
         """
-        def __init__(self, queue: asyncio.Queue[bytes], expected_peer: Tuple[str, int]):
-            self.queue = queue
+        def __init__(self, pending: Dict[int, 'asyncio.Future[bytes]'],
+                     expected_peer: Tuple[str, int]):
+            self.pending = pending
             self.expected_peer = expected_peer
             self.transport: Optional[asyncio.DatagramTransport] = None
 
@@ -44,99 +67,125 @@ class HardwareClient:
             self.transport = cast(asyncio.DatagramTransport, transport)
 
         def datagram_received(self, data: bytes, addr: Tuple[str, int]):
-            # Filter 1: Peer IP/Port check
+            # Filter: Peer IP/Port check
             if addr != self.expected_peer:
                 return
-            # Filter 2: Drop 0-byte keepalives
+
+            # Hot path: route by echoed opcode (offset 2 per DroneProtocol)
+            # with a single C-level dict pop - no per-packet opcode compares
+            # in Python.
+            if len(data) >= 3 and (fut := self.pending.pop(data[2], None)) is not None:
+                if not fut.done():
+                    fut.set_result(data)
+                return
+
+            # Slow path. Drop 0-byte keepalives first.
             if not data:
                 return
-            self.queue.put_nowait(data)
+
+            # Unmatchable reply: too short to carry an opcode, or an opcode
+            # nobody asked for (error frames, weird framing - this is RE,
+            # devices do that). With exactly one command in flight it can
+            # only belong to that caller, so hand it over rather than drop
+            # data a human might want to see.
+            if len(self.pending) == 1:
+                fut = self.pending.pop(next(iter(self.pending)))
+                if not fut.done():
+                    fut.set_result(data)
 
         def error_received(self, exc):
             logger.error(f"Transport Error: {exc}")
-        
+
         def connection_lost(self, exc):
             if exc:
                 logger.warning(f"Connection lost: {exc}")
+            # Fail fast: fail in-flight waiters instead of leaving them to
+            # burn their full timeout against a dead transport. Not cancel():
+            # wait_for() also cancels the inner future when the CALLER is
+            # cancelled, so send_command couldn't tell the two apart and
+            # would swallow real cancellations.
+            for fut in self.pending.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionResetError("Transport closed"))
+            self.pending.clear()
 
     async def connect(self) -> None:
         if self.transport:
             return
-        
+
         loop = asyncio.get_running_loop()
         transport, protocol = await loop.create_datagram_endpoint(
-            lambda: self.TransportProtocol(self._rx_queue, self.target),
+            lambda: self.TransportProtocol(self._pending, self.target),
             remote_addr=self.target,
         )
         self.transport = cast(asyncio.DatagramTransport, transport)
         self.protocol = cast(HardwareClient.TransportProtocol, protocol)
+        self._sendto = self.transport.sendto
         logger.info(f"Connected to {self.target}")
 
     async def send_command(self, packet: bytes, retries: int = 2, expected_opcode: Optional[int] = None) -> Optional[bytes]:
         """
         Sends a packet and waits for a response.
-        
+
         Args:
             packet: Raw bytes to send.
             retries: Number of retry attempts on timeout.
-            expected_opcode: If set, discard received packets that do not contain 
-                             this opcode (at offset 2). Mitigates race conditions.
+            expected_opcode: Opcode the reply is matched on. Defaults to the
+                             opcode byte of the outgoing packet.
+
+        Safe to call concurrently for DIFFERENT opcodes; each in-flight
+        opcode gets its own future in the awaiting table.
         """
-        if not self.transport:
+        sendto = self._sendto
+        if sendto is None:
             await self.connect()
+            sendto = self._sendto
+            if sendto is None:
+                return None
+
+        if expected_opcode is None:
+            # The device echoes our opcode, so the request's own byte 2 is
+            # the natural transaction id. -1 = "unmatchable", only resolved
+            # via the single-in-flight fallback.
+            expected_opcode = packet[2] if len(packet) >= 3 else -1
 
+        loop = asyncio.get_running_loop()
         for attempt in range(retries + 1):
-            self._flush_queue() # Clear pre-send
-            
-            if self.transport:
-                self.transport.sendto(packet)
-            else:
-                return None
+            fut: 'asyncio.Future[bytes]' = loop.create_future()
+            self._pending[expected_opcode] = fut
+            sendto(packet)
 
-            # Wait loop to filter stale/wrong packets
-            start_time = time.monotonic()
-            while True:
-                remaining_time = self.timeout - (time.monotonic() - start_time)
-                if remaining_time <= 0:
-                    break # Timeout for this attempt
-
-                try:
-                    data = await asyncio.wait_for(self._rx_queue.get(), timeout=remaining_time)
-                    
-                    # If we don't care about opcode, or packet is too short to check, return data
-                    if expected_opcode is None or len(data) < 3:
-                        return data
-                    
-                    # Opcode check (assuming offset 2 based on DroneProtocol)
-                    rx_opcode = data[2]
-                    if rx_opcode == expected_opcode:
-                        return data
-                    else:
-                        logger.debug(f"Dropped mismatched opcode 0x{rx_opcode:02X} (Expected 0x{expected_opcode:02X})")
-                
-                except asyncio.TimeoutError:
-                    break 
-
-            # If we exit the while loop, we timed out for this attempt
-            if attempt < retries:
-                logger.debug(f"Timeout (Attempt {attempt+1}/{retries+1}), retrying...")
+            try:
+                return await asyncio.wait_for(fut, timeout=self.timeout)
+            except ConnectionResetError:
+                # connection_lost / close() failed our future - report "no
+                # reply" rather than burning the rest of the timeout. Caller
+                # cancellation still propagates as CancelledError untouched.
+                logger.warning("Transport closed while awaiting reply.")
+                return None
+            except asyncio.TimeoutError:
+                if attempt < retries:
+                    logger.debug(f"Timeout (Attempt {attempt+1}/{retries+1}), retrying...")
+            finally:
+                # Only remove our own entry - a retry may have replaced it.
+                if self._pending.get(expected_opcode) is fut:
+                    self._pending.pop(expected_opcode, None)
 
         logger.warning(f"Cmd failed after {retries+1} attempts.")
         return None
 
-    def _flush_queue(self) -> None:
-        while not self._rx_queue.empty():
-            try:
-                self._rx_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-
     def close(self) -> None:
         if self.transport:
             self.transport.close()
             self.transport = None
             self.protocol = None
-        self._flush_queue()
+        self._sendto = None
+        # connection_lost is only scheduled by transport.close(), so fail
+        # waiters here as well for an immediate effect.
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionResetError("Client closed"))
+        self._pending.clear()
 
 # ==============================================================================
 # 2. ROBUST PROTOCOL HANDLER
@@ -148,35 +197,65 @@ class OpCode(int, Enum):
     SET_LED       = 0x20
     UNKNOWN       = 0x00 
 
-@dataclass(frozen=True)
-class Frame:
+# Parsed frames carry zero-copy views into the receive buffer. memoryview
+# supports len/hex()/iteration/== against bytes, so most callers never
+# notice; call bytes(frame.payload) if you need to keep the data around.
+Buffer = Union[bytes, memoryview]
+
+class Frame(NamedTuple):
+    # NamedTuple, not a frozen dataclass: construction is C-level (no
+    # per-field object.__setattr__) and instances carry no __dict__, which
+    # matters when a frame is allocated per received packet.
     header: int
     length: int
     opcode: int
-    payload: bytes
+    payload: Buffer
     checksum: int
-    raw: bytes
+    raw: Buffer
     is_valid: bool
     error_msg: str
-    trailing_data: bytes = field(default_factory=bytes)
+    trailing_data: Buffer = b""
 
 class DroneProtocol:
     HEADER = 0x55
 
     @staticmethod
     def calculate_checksum(data: bytes) -> int:
-        chk = 0
-        for b in data:
-            chk ^= b
-        return chk
+        """
+        XOR checksum, folded 8 bytes at a time (SWAR).
+
+        The old per-byte loop dispatched one bytecode op per byte, which
+        dominated build_packet/parse_frame during a 256-opcode scan. Here we
+        reinterpret the buffer as little-endian uint64 words, XOR the words
+        together, then collapse the 8 byte-lanes into a single byte. Padding
+        with zeros is safe because 0 is the XOR identity.
+        """
+        if _xor_checksum is not None:
+            return _xor_checksum(data)
+
+        if len(data) < 8:
+            # Tiny frame: reduce() is a C-level loop, not worth padding.
+            return reduce(operator.xor, data, 0)
+
+        pad = (-len(data)) % 8
+        # bytes() here also flattens memoryview input (parse_frame hands us
+        # views); zero bytes are the XOR identity.
+        buf = bytes(data) + b"\x00" * pad if pad else data
+        acc = 0
+        for word in struct.unpack(f"<{len(buf) // 8}Q", buf):
+            acc ^= word
+
+        # Fold 64 -> 32 -> 16 -> 8 bits.
+        acc ^= acc >> 32
+        acc ^= acc >> 16
+        acc ^= acc >> 8
+        return acc & 0xFF
 
     @classmethod
     def build_packet(cls, opcode: int, payload: bytes = b"") -> bytes:
-        length = 1 + len(payload)
-        # Struct: Header, Len, Opcode
-        body = struct.pack("<BBB", cls.HEADER, length, opcode) + payload
-        chk = cls.calculate_checksum(body)
-        return body + struct.pack("<B", chk)
+        # Hot path: scans and pollers rebuild the same tiny frames over and
+        # over (256 no-payload variants during a scan). Memoized below.
+        return _build_packet_cached(opcode, payload)
 
     @classmethod
     def parse_frame(cls, data: bytes) -> Frame:
@@ -195,25 +274,37 @@ class DroneProtocol:
 
         length = data[1]
         # Assumed Total size = Header(1) + LenByte(1) + LenVal + Checksum(1)
-        expected_total = 1 + 1 + length + 1
-        
+        if _frame_scan is not None:
+            # Compiled kernel: size + body checksum in one C pass.
+            expected_total, calc_chk = _frame_scan(data)
+        else:
+            expected_total = 1 + 1 + length + 1
+            calc_chk = None  # Computed below, once truncation is ruled out
+
+
         if len(data) < expected_total:
              return Frame(header, length, 0, b"", 0, data, False, 
                           f"Truncated: Exp {expected_total} Got {len(data)}")
 
-        frame_data = data[:expected_total]
-        trailing = data[expected_total:]
-        
+        # Slice a view, not the bytes: each bytes slice is a copy, and at
+        # 10 Hz polling / scan rates those add up to real GC pressure.
+        # memoryview slices share the original receive buffer; bytes are
+        # only materialized if a caller explicitly asks (bytes(payload)).
+        mv = memoryview(data)
+        frame_data = mv[:expected_total]
+        trailing = mv[expected_total:]
+
         opcode = frame_data[2]
         received_chk = frame_data[-1]
-        
+
         # Payload extraction happens BEFORE checksum validation
         payload_len = max(0, length - 1)
         payload = frame_data[3 : 3 + payload_len]
 
-        body = frame_data[:-1] 
-        calc_chk = cls.calculate_checksum(body)
-        
+        if calc_chk is None:
+            calc_chk = cls.calculate_checksum(frame_data[:-1])
+
+
         if not header_ok:
              return Frame(header, length, opcode, payload, received_chk, frame_data, False, 
                           f"Bad Header 0x{header:02X}", trailing)
@@ -227,13 +318,11 @@ class DroneProtocol:
     @classmethod
     def decode_telemetry(cls, payload: bytes) -> Dict[str, Any]:
         """Strict telemetry decoder."""
-        fmt = "<BHfB"
-        expected = struct.calcsize(fmt)
-        if len(payload) != expected:
+        if len(payload) != _TELEM.size:
             return {"error": "size_mismatch", "raw": payload.hex()}
-        
+
         try:
-            bat, volt, alt, err = struct.unpack(fmt, payload)
+            bat, volt, alt, err = _TELEM.unpack(payload)
             return {
                 "battery": bat,
                 "voltage": volt,
@@ -243,48 +332,158 @@ class DroneProtocol:
         except Exception as e:
             return {"error": str(e), "raw": payload.hex()}
 
+    # NumPy mirror of _TELEM, built lazily (numpy is optional for the core
+    # tool - see requirements.txt).
+    _TELEM_DT = None
+
+    @classmethod
+    def decode_telemetry_batch(cls, buf: Buffer, count: int = -1):
+        """
+        Decode a contiguous run of telemetry records in one C pass.
+
+        For replay/fuzz corpora (recorded captures) the per-record
+        decode_telemetry call dominates; np.frombuffer walks all N records
+        in one go instead. Returns a structured array with fields
+        bat/volt/alt/err. Keep decode_telemetry for single live records -
+        struct is faster than numpy for one element.
+
+        Requires numpy; raises RuntimeError if it isn't installed.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise RuntimeError(
+                "decode_telemetry_batch needs numpy (pip install numpy); "
+                "use decode_telemetry for the stdlib-only path."
+            ) from e
+
+        if cls._TELEM_DT is None:
+            cls._TELEM_DT = np.dtype([
+                ("bat", np.uint8),
+                ("volt", "<u2"),
+                ("alt", "<f4"),
+                ("err", np.uint8),
+            ])
+        return np.frombuffer(buf, dtype=cls._TELEM_DT, count=count)
+
+# Scratch buffer for the builder below, sized for the largest legal frame
+# (header + len + opcode + 254 payload bytes + checksum). Safe to share
+# because everything runs on one event loop and the buffer never escapes:
+# only the final bytes() copy does.
+_BUILD_BUF = bytearray(260)
+
+@lru_cache(maxsize=512)
+def _build_packet_cached(opcode: int, payload: bytes) -> bytes:
+    """
+    Memoized packet builder backing DroneProtocol.build_packet.
+
+    Packets are pure functions of (opcode, payload) and both arguments are
+    hashable, so repeated builds (the 256 scan opcodes, the telemetry poll)
+    become a dict hit instead of struct.pack + a checksum pass each time.
+
+    Cache misses assemble the frame in the module scratch bytearray - one
+    allocation for the final bytes() instead of three temporaries from the
+    old pack + payload + pack concatenation.
+    """
+    n = len(payload)
+    buf = _BUILD_BUF
+    # Struct: Header, Len, Opcode
+    _HDR.pack_into(buf, 0, DroneProtocol.HEADER, 1 + n, opcode)
+    buf[3:3 + n] = payload
+    buf[3 + n] = DroneProtocol.calculate_checksum(memoryview(buf)[:3 + n])
+    return bytes(memoryview(buf)[:4 + n])
+
 # ==============================================================================
 # 3. SCANNER LOGIC
 # ==============================================================================
 
 class DroneScanner:
+    # Upper bound on inter-send spacing. Fast devices earn a smaller gap
+    # via the RTT average; timeouts already provide their own spacing.
+    MAX_GAP = 0.02
+
     def __init__(self, client: HardwareClient):
         self.client = client
+        self._rtt_ewma: Optional[float] = None  # seconds
+        self._last_send = 0.0                   # monotonic timestamp
+
+    def _note_rtt(self, rtt: float) -> None:
+        if self._rtt_ewma is None:
+            self._rtt_ewma = rtt
+        else:
+            self._rtt_ewma = 0.8 * self._rtt_ewma + 0.2 * rtt
 
-    async def scan_opcodes(self, output_file="scan_results.csv"):
-        logger.info("Starting Opcode Fuzz/Scan...")
-        
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Opcode_Hex", "Status", "Rx_Len", "Rx_Opcode", 
-                             "Rx_Payload_Hex", "Trailing_Bytes", "Error_Msg", "RTT_ms"])
-            
-            for op in range(0, 256):
-                tx_pkt = DroneProtocol.build_packet(op)
-                
+    async def _pace(self) -> None:
+        """
+        Adaptive rate limit between sends.
+
+        Replaces the old unconditional 20 ms sleep per opcode (which added
+        a flat ~5 s to every scan, even after 1 s timeouts). The gap tracks
+        the EWMA of observed RTTs, capped at MAX_GAP, and only the portion
+        not already spent since the previous send is slept.
+
+        The send slot is claimed BEFORE sleeping: with many probes in
+        flight, each caller bumps _last_send by one gap as it enters, so
+        concurrent waiters line up on distinct deadlines instead of all
+        timing off the same last send and bursting out together on wake.
+        """
+        gap = self.MAX_GAP if self._rtt_ewma is None else min(self.MAX_GAP, self._rtt_ewma)
+        now = time.monotonic()
+        slot = max(now, self._last_send + gap)
+        self._last_send = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def scan_opcodes(self, output_file="scan_results.csv", concurrency: int = 32):
+        """
+        Probes all 256 opcodes with up to `concurrency` requests in flight.
+
+        The scan is latency-bound, not compute-bound: serially it costs
+        256 x (RTT + pacing). Since the client routes replies by opcode,
+        overlapping requests are unambiguous and the wall clock drops by
+        roughly the concurrency factor.
+        """
+        logger.info(f"Starting Opcode Fuzz/Scan (x{concurrency} in flight)...")
+        sem = asyncio.Semaphore(concurrency)
+
+        async def probe(op: int):
+            tx_pkt = DroneProtocol.build_packet(op)
+            async with sem:
+                await self._pace()  # Be gentle to tiny MCUs, but no more
                 start = time.perf_counter()
                 rx_bytes = await self.client.send_command(tx_pkt, retries=1, expected_opcode=op)
                 duration = (time.perf_counter() - start) * 1000
+                if rx_bytes:
+                    self._note_rtt(duration / 1000)
+            return rx_bytes, duration
+
+        results = await asyncio.gather(*(probe(op) for op in range(256)))
+
+        rows = [["Opcode_Hex", "Status", "Rx_Len", "Rx_Opcode",
+                 "Rx_Payload_Hex", "Trailing_Bytes", "Error_Msg", "RTT_ms"]]
+
+        for op, (rx_bytes, duration) in enumerate(results):
+            if not rx_bytes:
+                rows.append([f"0x{op:02X}", "TIMEOUT", 0, "", "", "", "", f"{duration:.2f}"])
+                continue
+
+            frame = DroneProtocol.parse_frame(rx_bytes)
+            log_status = "VALID" if frame.is_valid else "INVALID_FMT"
+
+            rows.append([
+                f"0x{op:02X}", log_status, len(frame.raw), f"0x{frame.opcode:02X}",
+                frame.payload.hex().translate(_UP), len(frame.trailing_data),
+                frame.error_msg, f"{duration:.2f}"
+            ])
+
+            if frame.is_valid:
+                logger.info(f"Hit: 0x{op:02X} -> Payload: {frame.payload.hex().translate(_UP)}")
+
+        # One buffered bulk write instead of 256 small writerow calls; there
+        # is no consumer mid-run, so nothing needs the file early.
+        with open(output_file, 'w', newline='', buffering=1 << 20) as f:
+            csv.writer(f).writerows(rows)
 
-                if not rx_bytes:
-                    writer.writerow([f"0x{op:02X}", "TIMEOUT", 0, "", "", "", "", f"{duration:.2f}"])
-                    await asyncio.sleep(0.02)
-                    continue
-
-                frame = DroneProtocol.parse_frame(rx_bytes)
-                log_status = "VALID" if frame.is_valid else "INVALID_FMT"
-                
-                writer.writerow([
-                    f"0x{op:02X}", log_status, len(frame.raw), f"0x{frame.opcode:02X}",
-                    frame.payload.hex().upper(), len(frame.trailing_data),
-                    frame.error_msg, f"{duration:.2f}"
-                ])
-                
-                if frame.is_valid:
-                    logger.info(f"Hit: 0x{op:02X} -> Payload: {frame.payload.hex().upper()}")
-                
-                await asyncio.sleep(0.02)
-        
         logger.info(f"Scan complete. Results saved to {output_file}")
 
 # ==============================================================================
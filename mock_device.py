@@ -1,8 +1,18 @@
 import asyncio
+import multiprocessing
+import os
+import socket
 import struct
-import logging
 import random
 
+# Optional: picologging is a drop-in C implementation of the logging
+# module that formats records several times faster. Only matters if you
+# run with DEBUG traffic logging at wire rate.
+try:
+    import picologging as logging
+except ImportError:
+    import logging
+
 # Reuse the Protocol logic from the tool so the mock matches the client
 # This is critical. It listens on port 8889 and replies to the GET_TELEMETRY opcode with valid data. 
 # This proves to you/yourr team that the scanner, the protocol definitions, and the Wireshark dissector 
@@ -10,75 +20,286 @@ import random
 HEADER = 0x55
 PORT = 8889
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - MOCK - %(message)s')
+# Precompiled wire formats: skips re-tokenizing the format string per call.
+_HDR = struct.Struct("<BBB")      # Header, Length, Opcode
+_TELEM = struct.Struct("<BHfB")   # Battery, Voltage, Altitude, Error flags
+
+# No %(asctime)s: it costs a strftime per record, and the per-packet lines
+# are the only high-volume output. Timestamps belong to the scanner's logs.
+logging.basicConfig(level=logging.INFO, format='MOCK - %(message)s')
+log = logging.getLogger(__name__)
+
+def _parse(data):
+    """Validate a request and return its opcode, or -1 to ignore it."""
+    if len(data) < 4 or data[0] != HEADER:
+        return -1
+    return data[2]
+
+# Optional: numba (pip install numba) JIT-compiles the per-datagram header
+# check, removing interpreter dispatch from the hot loop. The pure-Python
+# version above is the default and behaves identically.
+try:
+    from numba import njit
+    _parse = njit(cache=True)(_parse)
+except ImportError:
+    pass
+
+# Optional: AOT-compiled C versions of the parse/build helpers (see
+# mock_device_fast.pyx; python setup.py build_ext --inplace). Preferred
+# over the numba path when built: no JIT warmup, no runtime dependency.
+try:
+    from mock_device_fast import parse_request as _parse
+    from mock_device_fast import build_packet as _build_packet_fast
+except ImportError:
+    _build_packet_fast = None
+
+# Optional: numpy pushes the XOR fold into a SIMD reduction for big
+# buffers. Not worth the call overhead for the small frames the mock
+# actually ships, so _xor_fold only takes this path past 64 bytes.
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+def _xor_fold(data: bytes) -> int:
+    if _np is not None and len(data) > 64:
+        return int(_np.bitwise_xor.reduce(_np.frombuffer(data, _np.uint8)))
+    # XOR the buffer eight bytes at a time as little-endian uint64 lanes,
+    # then collapse the lanes to one byte. Avoids a Python bytecode op per
+    # byte; zero padding is the XOR identity so it can't change the result.
+    pad = (-len(data)) % 8
+    if pad:
+        data = bytes(data) + b"\x00" * pad
+    acc = 0
+    for i in range(0, len(data), 8):
+        acc ^= int.from_bytes(data[i:i + 8], "little")
+    acc ^= acc >> 32
+    acc ^= acc >> 16
+    acc ^= acc >> 8
+    return acc & 0xFF
+
+# Reusable packet-build buffer, big enough for the largest legal frame
+# (1-byte length field => 258-byte packet). Same trick as the client tool.
+_SCRATCH = bytearray(260)
+
+class _Hex:
+    """Lazy hex dump for log args: logging only calls __str__ if the record
+    is actually emitted, so the two string allocations are deferred too."""
+    __slots__ = ('b',)
+
+    def __init__(self, b):
+        self.b = b
+
+    def __str__(self):
+        return self.b.hex().upper()
+
+# Per-call non-blocking flag for the drain loop: keeps it safe even if
+# someone hands MockDrone a blocking socket. Not on Windows, where
+# _make_socket's setblocking(False) covers the same ground.
+_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+class MockDrone:
+    # Max datagrams handled per event-loop wake. Amortises the loop/callback
+    # overhead across a burst (a scanner sweep arrives as one) while still
+    # bounding how long one flood can hog the loop. Python's socket module
+    # doesn't expose recvmmsg, so the drain is a tight recvfrom loop rather
+    # than one batched syscall.
+    BATCH = 64
+
+    def __init__(self, sock):
+        # Non-blocking UDP socket, already bound. We read and reply on the
+        # raw socket directly rather than through an asyncio transport:
+        # skips the send-side buffering/flow-control bookkeeping, which is
+        # fine for a mock on loopback (a full kernel buffer just drops the
+        # datagram, which is UDP anyway).
+        self._sock = sock
+
+    def drain(self):
+        """Reader callback: pull up to BATCH datagrams and reply to each."""
+        recvfrom = self._sock.recvfrom
+        sendto = self._sock.sendto
+        get_resp = _RESP.get
+        # Per-packet logging is DEBUG-only: at wire rate the f-string and
+        # .hex() allocations alone were the dominant cost, even with no
+        # handler attached. Run with level=DEBUG to see the traffic.
+        verbose = log.isEnabledFor(logging.DEBUG)
+
+        for _ in range(self.BATCH):
+            try:
+                data, addr = recvfrom(2048, _DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                return # Drained
+
+            # Parse request: [Head][Len][Op][...][Chk]
+            # _parse folds the length/header checks and opcode extraction
+            # into one call (JIT-compiled when numba is installed).
+            opcode = _parse(data)
+            if opcode < 0:
+                continue # Garbage, or not for us
+
+            if verbose:
+                log.debug("Rx Opcode: 0x%02X from %s", opcode, addr)
+
+            response = get_resp(opcode)
+            if response:
+                sendto(response, addr)
+                if verbose:
+                    log.debug("Tx Reply: %s", _Hex(response))
+
+    def handle_command(self, opcode):
+        # Opcode -> prebuilt reply dispatch table (_RESP below); see
+        # build_packet for adding new opcodes. Unknown opcode -> None,
+        # i.e. no reply (simulates a timeout).
+        return _RESP.get(opcode)
+
+    @staticmethod
+    def build_packet(opcode, payload):
+        if _build_packet_fast is not None:
+            return _build_packet_fast(opcode, payload)
+        # One allocation (the returned bytes): header packed straight into
+        # the module scratch buffer, payload slice-assigned, checksum
+        # written in place. Safe to share one buffer because the mock is
+        # single-threaded and the result is copied out before return.
+        n = len(payload)
+        buf = _SCRATCH
+        _HDR.pack_into(buf, 0, HEADER, 1 + n, opcode)  # Header, Len, Opcode
+        buf[3:3 + n] = payload
+        buf[3 + n] = _xor_fold(memoryview(buf)[:3 + n])
+        return bytes(memoryview(buf)[:4 + n])
 
-class MockDrone(asyncio.DatagramProtocol):
+
+# GET_TELEMETRY (0x11): Battery(U8), Voltage(U16), Alt(f), Err(U8)
+# 85% battery, 14000mV, 15.5m alt, 0 errors. Kept as a mutable bytearray:
+# the battery byte is the one parametric field (see set_battery), the rest
+# of the frame stays constant.
+_TELEM_PKT = bytearray(MockDrone.build_packet(0x11, _TELEM.pack(85, 14000, 15.5, 0)))
+_BAT_OFFSET = 3   # Header, Len, Opcode, then battery is payload byte 0
+
+def set_battery(percent):
+    """Patch the telemetry reply's battery byte (and checksum) in place.
+
+    XOR is self-inverse, so folding the old and new byte values into the
+    stored checksum replaces the O(N) re-fold with an O(1) delta.
+    """
+    old = _TELEM_PKT[_BAT_OFFSET]
+    _TELEM_PKT[_BAT_OFFSET] = percent
+    _TELEM_PKT[-1] ^= old ^ percent
+
+_RESP = {
+    0x11: _TELEM_PKT,
+    # GET_STATUS (0x10): simple "Ready" (0x01)
+    0x10: MockDrone.build_packet(0x10, b'\x01'),
+}
+
+class _ProtocolFallback(asyncio.DatagramProtocol):
+    """Transport-based fallback for event loops without add_reader support
+    (Windows' default ProactorEventLoop raises NotImplementedError). One
+    callback trip per datagram, but the same parse/reply logic as
+    MockDrone.drain, so behaviour is identical — just slower under load.
+    """
     def connection_made(self, transport):
         self.transport = transport
-        logging.info(f"Mock Drone listening on 127.0.0.1:{PORT}")
 
     def datagram_received(self, data, addr):
-        if len(data) < 4:
-            return # Garbage
-
-        if data[0] != HEADER:
-            return # Not for us
+        opcode = _parse(data)
+        if opcode < 0:
+            return # Garbage, or not for us
 
-        # Parse request
-        # [Head][Len][Op][...][Chk]
-        opcode = data[2]
-        logging.info(f"Rx Opcode: 0x{opcode:02X} from {addr}")
+        verbose = log.isEnabledFor(logging.DEBUG)
+        if verbose:
+            log.debug("Rx Opcode: 0x%02X from %s", opcode, addr)
 
-        # Simulate processing delay
-        # await asyncio.sleep(0.01) # Can't await in sync callback, generally fast enough
-
-        response = self.handle_command(opcode)
+        response = _RESP.get(opcode)
         if response:
             self.transport.sendto(response, addr)
-            logging.info(f"Tx Reply: {response.hex().upper()}")
+            if verbose:
+                log.debug("Tx Reply: %s", _Hex(response))
 
-    def handle_command(self, opcode):
-        # 1. GET_TELEMETRY (0x11) -> Return valid battery/altitude
-        if opcode == 0x11:
-            # Payload: Battery(U8), Voltage(U16), Alt(f), Err(U8)
-            # 85% battery, 14000mV, 15.5m alt, 0 errors
-            payload = struct.pack("<BHfB", 85, 14000, 15.5, 0)
-            return self.build_packet(opcode, payload)
-        
-        # 2. GET_STATUS (0x10) -> Return simple "Ready" (0x01)
-        elif opcode == 0x10:
-            payload = b'\x01'
-            return self.build_packet(opcode, payload)
-
-        # 3. UNKNOWN -> Don't reply (Simulate timeout)
-        # Or reply with error if you want to test that path
-        return None
-
-    def build_packet(self, opcode, payload):
-        length = 1 + len(payload)
-        # Header, Len, Opcode, Payload
-        body = struct.pack("<BBB", HEADER, length, opcode) + payload
-        checksum = 0
-        for b in body:
-            checksum ^= b
-        return body + struct.pack("B", checksum)
+def _make_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    # 4 MiB socket buffers: the Linux default (~208 KiB) silently drops
+    # datagrams when the scanner floods us during stress tests. The kernel
+    # clamps these to net.core.{r,w}mem_max, so this is best-effort.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+    # SO_REUSEPORT lets several mock processes share the port, with the
+    # kernel hash-distributing datagrams between them. Not on Windows.
+    if hasattr(socket, 'SO_REUSEPORT'):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(('127.0.0.1', PORT))
+    return sock
+
+async def _drift_battery():
+    # Random-walk the battery once a second so client dashboards show a
+    # live trace instead of a flat line. Happens off the reply path; the
+    # drain loop keeps sending whatever the packet currently says.
+    level = _TELEM_PKT[_BAT_OFFSET]
+    while True:
+        level = min(100, max(20, level + random.randrange(-2, 3)))
+        set_battery(level)
+        await asyncio.sleep(1.0)
 
 async def main():
     loop = asyncio.get_running_loop()
-    transport, protocol = await loop.create_datagram_endpoint(
-        lambda: MockDrone(),
-        local_addr=('127.0.0.1', PORT)
-    )
-    
+    sock = _make_socket()
+
+    drone = MockDrone(sock)
+    transport = None
+    try:
+        loop.add_reader(sock.fileno(), drone.drain)
+    except NotImplementedError:
+        # ProactorEventLoop (Windows default) can't watch raw sockets; fall
+        # back to a regular datagram endpoint on the same configured socket.
+        transport, _ = await loop.create_datagram_endpoint(
+            _ProtocolFallback, sock=sock)
+    drift = asyncio.ensure_future(_drift_battery())
+    log.info("Mock Drone listening on 127.0.0.1:%d (pid %d)", PORT, os.getpid())
+
     try:
         await asyncio.Future() # Run forever
     except asyncio.CancelledError:
         pass
     finally:
-        transport.close()
+        drift.cancel()
+        if transport is not None:
+            transport.close()
+        else:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+
+def _worker():
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
+    # Optional: uvloop (pip install uvloop) swaps in a libuv-backed event
+    # loop, which roughly doubles datagram throughput under load. The mock
+    # works fine without it.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    # MOCK_WORKERS=N shards the mock across N processes, each with its own
+    # event loop and SO_REUSEPORT-bound socket; the kernel distributes
+    # datagrams between them. The mock is stateless, so workers need no
+    # coordination. Default is 1 (the old single-process behaviour).
+    workers = int(os.environ.get("MOCK_WORKERS", "1"))
+    procs = []
+    if workers > 1 and hasattr(socket, 'SO_REUSEPORT'):
+        for _ in range(workers - 1):
+            p = multiprocessing.Process(target=_worker, daemon=True)
+            p.start()
+            procs.append(p)
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         pass
+    finally:
+        for p in procs:
+            p.terminate()
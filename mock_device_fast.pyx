@@ -0,0 +1,38 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional C kernels for the mock device's per-packet work.
+
+Same idea as _drone_accel, but for the server side: an ahead-of-time
+compiled request parser and packet builder with no JIT warmup and no
+runtime dependency (unlike the numba path). mock_device imports these if
+present and silently falls back to pure Python otherwise.
+
+Build (needs Cython + a C compiler, both optional):
+
+    pip install cython
+    python setup.py build_ext --inplace
+"""
+
+
+cpdef int parse_request(const unsigned char[::1] data):
+    """Validate a request and return its opcode, or -1 to ignore it."""
+    if data.shape[0] < 4 or data[0] != 0x55:
+        return -1
+    return data[2]
+
+
+cpdef bytes build_packet(int opcode, const unsigned char[::1] payload):
+    """Build [Head][Len][Op][Payload][Chk] in one pass, checksum included."""
+    cdef Py_ssize_t i, n = payload.shape[0]
+    cdef bytearray out = bytearray(4 + n)
+    cdef unsigned char[::1] buf = out
+    cdef unsigned char chk = 0
+    buf[0] = 0x55
+    buf[1] = <unsigned char>(1 + n)
+    buf[2] = <unsigned char>opcode
+    for i in range(n):
+        buf[3 + i] = payload[i]
+    for i in range(3 + n):
+        chk ^= buf[i]
+    buf[3 + n] = chk
+    return bytes(out)
@@ -0,0 +1,18 @@
+"""
+Builds the OPTIONAL C accelerator modules (_drone_accel for the client
+tool, mock_device_fast for the mock).
+
+The harness itself is standard-library only and does not need these. Only
+bother if you are fuzzing at wire rate and profiling shows parse_frame /
+calculate_checksum (or the mock's reply path) at the top:
+
+    pip install cython
+    python setup.py build_ext --inplace
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="udp-hardware-harness-accel",
+    ext_modules=cythonize(["_drone_accel.pyx", "mock_device_fast.pyx"]),
+)